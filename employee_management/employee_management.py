@@ -1,5 +1,640 @@
 # FILE: employee_management.py
 
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from types import MappingProxyType
+
+class SkillBitmapIndex:
+    """
+    Inverted index from skill to the employees that have it.
+
+    Every employee gets a dense slot (freed slots are reused) and each skill keeps a
+    bitmap of slots split into 65536-slot chunks, stored as Python ints keyed by chunk
+    number. Chunks with no bits set are dropped, so rare skills stay small, updates only
+    rewrite one 8 KB chunk, and set algebra skips chunks a skill never touches.
+    """
+
+    CHUNK_BITS = 16
+    CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+    def __init__(self):
+        self.slots = {}
+        self.slot_employees = []
+        self.free_slots = []
+        self.bitmaps = {}
+        self.counts = {}
+        self.live = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _set(self, chunks, slot):
+        chunk = slot >> self.CHUNK_BITS
+        chunks[chunk] = chunks.get(chunk, 0) | (1 << (slot & self.CHUNK_MASK))
+
+    def _unset(self, chunks, slot):
+        chunk = slot >> self.CHUNK_BITS
+        bits = chunks.get(chunk, 0) & ~(1 << (slot & self.CHUNK_MASK))
+        if bits:
+            chunks[chunk] = bits
+        else:
+            chunks.pop(chunk, None)
+
+    def add(self, emp_id, skills):
+        """Indexes an employee's skills, allocating a slot if needed."""
+        slot = self.slots.get(emp_id)
+        if slot is None:
+            if self.free_slots:
+                slot = self.free_slots.pop()
+                self.slot_employees[slot] = emp_id
+            else:
+                slot = len(self.slot_employees)
+                self.slot_employees.append(emp_id)
+            self.slots[emp_id] = slot
+            self._set(self.live, slot)
+        for skill in skills:
+            chunks = self.bitmaps.setdefault(skill, {})
+            before = chunks.get(slot >> self.CHUNK_BITS, 0)
+            self._set(chunks, slot)
+            if chunks[slot >> self.CHUNK_BITS] != before:
+                self.counts[skill] = self.counts.get(skill, 0) + 1
+
+    def discard_skills(self, emp_id, skills):
+        """Clears the given skills for an employee, keeping its slot."""
+        slot = self.slots.get(emp_id)
+        if slot is None:
+            return
+        bit = 1 << (slot & self.CHUNK_MASK)
+        for skill in skills:
+            chunks = self.bitmaps.get(skill)
+            if chunks is None or not chunks.get(slot >> self.CHUNK_BITS, 0) & bit:
+                continue
+            self._unset(chunks, slot)
+            self.counts[skill] -= 1
+            if not chunks:
+                del self.bitmaps[skill]
+                del self.counts[skill]
+
+    def remove(self, emp_id, skills):
+        """Drops an employee and frees its slot."""
+        if emp_id not in self.slots:
+            return
+        self.discard_skills(emp_id, skills)
+        slot = self.slots.pop(emp_id)
+        self.slot_employees[slot] = None
+        self.free_slots.append(slot)
+        self._unset(self.live, slot)
+
+    def update(self, emp_id, old_skills, new_skills):
+        """Applies only the skills that changed."""
+        self.discard_skills(emp_id, set(old_skills) - set(new_skills))
+        self.add(emp_id, set(new_skills) - set(old_skills))
+
+    def clear(self):
+        """Drops every employee and bitmap."""
+        self.__init__()
+
+    def count(self, skill):
+        """Returns how many employees have a skill."""
+        return self.counts.get(skill, 0)
+
+    def _union(self, skills):
+        union = {}
+        for skill in skills:
+            for chunk, bits in self.bitmaps.get(skill, {}).items():
+                union[chunk] = union.get(chunk, 0) | bits
+        return union
+
+    def query_bitmap(self, all_of=(), any_of=(), none_of=()):
+        """Returns the chunked bitmap of employees matching the skill expression."""
+        all_of = list(all_of)
+        any_of = list(any_of)
+        if all_of:
+            if any(skill not in self.bitmaps for skill in all_of):
+                return {}
+            all_of.sort(key=self.count)
+            result = dict(self.bitmaps[all_of[0]])
+            for skill in all_of[1:]:
+                chunks = self.bitmaps[skill]
+                result = {chunk: bits & chunks[chunk] for chunk, bits in result.items()
+                          if chunk in chunks and bits & chunks[chunk]}
+                if not result:
+                    return result
+            if any_of:
+                union = self._union(any_of)
+                result = {chunk: bits & union[chunk] for chunk, bits in result.items()
+                          if chunk in union and bits & union[chunk]}
+        elif any_of:
+            result = self._union(any_of)
+        else:
+            result = dict(self.live)
+        if none_of and result:
+            excluded = self._union(none_of)
+            result = {chunk: bits & ~excluded.get(chunk, 0) for chunk, bits in result.items()
+                      if bits & ~excluded.get(chunk, 0)}
+        return result
+
+    def employees_in(self, bitmap):
+        """Decodes a chunked bitmap into employee IDs in slot order."""
+        employee_ids = []
+        slot_employees = self.slot_employees
+        for chunk in sorted(bitmap):
+            base = chunk << self.CHUNK_BITS
+            bits = bin(bitmap[chunk])[:1:-1]
+            position = bits.find("1")
+            while position != -1:
+                employee_ids.append(slot_employees[base + position])
+                position = bits.find("1", position + 1)
+        return employee_ids
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """Returns employee IDs with all of `all_of`, at least one of `any_of` and none of `none_of`."""
+        return self.employees_in(self.query_bitmap(all_of, any_of, none_of))
+
+    def query_count(self, all_of=(), any_of=(), none_of=()):
+        """Counts matching employees without decoding their IDs."""
+        return sum(bin(bits).count("1") for bits in self.query_bitmap(all_of, any_of, none_of).values())
+
+
+class RangeIndex:
+    """
+    Ordered index of employees on one field, overall and per department.
+
+    Entries are sorted (value, emp_id) lists maintained with bisect, so range queries
+    cost O(log n + k), min/max read the ends of the list and ordered iteration walks
+    the list in place. `key` picks the field from an employee tuple, so the same class
+    indexes age today and hire date or salary once those fields exist.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.entries = []
+        self.departments = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, details):
+        """Indexes one employee."""
+        entry = (self.key(details), details[0])
+        insort(self.entries, entry)
+        insort(self.departments.setdefault(details[3], []), entry)
+
+    def add_many(self, batch):
+        """Indexes a batch, re-sorting once when the batch is large."""
+        if len(batch) * 8 < len(self.entries):
+            for details in batch:
+                self.add(details)
+            return
+        key = self.key
+        self.entries.extend((key(details), details[0]) for details in batch)
+        self.entries.sort()
+        touched = set()
+        for details in batch:
+            self.departments.setdefault(details[3], []).append((key(details), details[0]))
+            touched.add(details[3])
+        for department in touched:
+            self.departments[department].sort()
+
+    def _discard(self, entries, entry):
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def remove(self, details):
+        """Drops one employee."""
+        entry = (self.key(details), details[0])
+        self._discard(self.entries, entry)
+        members = self.departments.get(details[3])
+        if members is not None:
+            self._discard(members, entry)
+            if not members:
+                del self.departments[details[3]]
+
+    def move(self, old_details, new_details):
+        """Re-indexes an employee whose value or department changed."""
+        if self.key(old_details) != self.key(new_details) or old_details[3] != new_details[3]:
+            self.remove(old_details)
+            self.add(new_details)
+
+    def clear(self):
+        """Drops every entry."""
+        self.entries = []
+        self.departments = {}
+
+    def _entries(self, department):
+        if department is None:
+            return self.entries
+        return self.departments.get(department, [])
+
+    def min(self, department=None):
+        """Returns the smallest (value, emp_id) entry or None."""
+        entries = self._entries(department)
+        return entries[0] if entries else None
+
+    def max(self, department=None):
+        """Returns the largest (value, emp_id) entry or None."""
+        entries = self._entries(department)
+        return entries[-1] if entries else None
+
+    def between(self, low, high, department=None):
+        """Yields (value, emp_id) entries with low <= value <= high in order."""
+        entries = self._entries(department)
+        start = bisect_left(entries, (low,))
+        stop = bisect_right(entries, (high, float("inf")))
+        for position in range(start, stop):
+            yield entries[position]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
+class OrgAggregates:
+    """
+    Dashboard counters kept current as employees change.
+
+    Headcount per department, skill frequency and an age histogram (buckets of
+    `age_bucket` years) are plain dicts adjusted by +1/-1 on each mutation. The snapshot
+    is a read-only view over those dicts, so reading it costs O(1); `verify` recounts
+    from the catalog and can rebuild the counters if they have drifted.
+    """
+
+    def __init__(self, age_bucket=10):
+        self.age_bucket = age_bucket
+        self.headcount = {}
+        self.skill_counts = {}
+        self.age_histogram = {}
+        self.total = 0
+        self.view = MappingProxyType({
+            "headcount": MappingProxyType(self.headcount),
+            "skill_counts": MappingProxyType(self.skill_counts),
+            "age_histogram": MappingProxyType(self.age_histogram),
+        })
+
+    def _bump(self, counts, key, delta):
+        value = counts.get(key, 0) + delta
+        if value:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+
+    def add(self, details, delta=1):
+        """Counts one employee in (or out, with delta=-1)."""
+        self.total += delta
+        self._bump(self.headcount, details[3], delta)
+        self._bump(self.age_histogram, details[2] // self.age_bucket * self.age_bucket, delta)
+        for skill in details[4]:
+            self._bump(self.skill_counts, skill, delta)
+
+    def remove(self, details):
+        """Counts one employee out."""
+        self.add(details, -1)
+
+    def move(self, old_details, new_details):
+        """Moves an employee's contribution from its old details to the new ones."""
+        self.remove(old_details)
+        self.add(new_details)
+
+    def clear(self):
+        """Zeroes every counter in place so existing views stay valid."""
+        self.headcount.clear()
+        self.skill_counts.clear()
+        self.age_histogram.clear()
+        self.total = 0
+
+    def snapshot(self):
+        """Returns a read-only view of the counters."""
+        return self.view
+
+    def verify(self, catalog, rebuild=False):
+        """Recounts from the catalog; returns True if the counters matched."""
+        fresh = OrgAggregates(self.age_bucket)
+        for details in catalog.values():
+            fresh.add(details)
+        consistent = (fresh.headcount == self.headcount and fresh.skill_counts == self.skill_counts
+                      and fresh.age_histogram == self.age_histogram and fresh.total == self.total)
+        if not consistent and rebuild:
+            self.clear()
+            self.headcount.update(fresh.headcount)
+            self.skill_counts.update(fresh.skill_counts)
+            self.age_histogram.update(fresh.age_histogram)
+            self.total = fresh.total
+        return consistent
+
+
+class ReportingHierarchy:
+    """
+    Manager tree with nested-interval labels and binary-lifting jump tables.
+
+    Every employee owns an integer interval [lo, hi) that holds the intervals of all of
+    its reports, so "is B under A" is two comparisons. Each node keeps spare room at the
+    end of its interval; a new report takes half of that room, and when it runs out the
+    nearest ancestor with enough space is re-spread in proportion to subtree sizes
+    (Python ints keep the label space unbounded). Moving a manager relabels only the
+    moved subtree. Jump tables (parent, grandparent, 4th ancestor, ...) give LCA in
+    O(log n) using the intervals for the ancestor test.
+    """
+
+    UNIT = 1 << 32
+    MIN_UNIT = 1 << 8
+
+    def __init__(self):
+        self.parent = {}
+        self.children = {}
+        self.size = {}
+        self.lo = {}
+        self.hi = {}
+        self.cursor = {}
+        self.jumps = {}
+        self.next_root = 0
+
+    def __contains__(self, emp_id):
+        return emp_id in self.parent
+
+    def contains(self, ancestor, emp_id):
+        """True if emp_id is ancestor itself or somewhere below it."""
+        return self.lo[ancestor] <= self.lo[emp_id] < self.hi[ancestor]
+
+    def _layout(self, node, low, high):
+        stack = [(node, low, high)]
+        while stack:
+            current, low, high = stack.pop()
+            self.lo[current] = low
+            self.hi[current] = high
+            available = high - low - 1
+            total = self.size[current]
+            cursor = low + 1
+            for child in self.children[current]:
+                width = available * self.size[child] // total
+                stack.append((child, cursor, cursor + width))
+                cursor += width
+            self.cursor[current] = cursor
+
+    def _place_root(self, node):
+        width = self.size[node] * self.UNIT * 2
+        low = self.next_root
+        self.next_root += width
+        self._layout(node, low, low + width)
+
+    def _refresh_jumps(self, node):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            parent = self.parent[current]
+            jumps = [] if parent is None else [parent]
+            while jumps:
+                above = self.jumps[jumps[-1]]
+                if len(above) < len(jumps):
+                    break
+                jumps.append(above[len(jumps) - 1])
+            self.jumps[current] = jumps
+            stack.extend(self.children[current])
+
+    def _resize(self, node, delta):
+        while node is not None:
+            self.size[node] += delta
+            node = self.parent[node]
+
+    def _attach(self, node, manager):
+        self.parent[node] = manager
+        self.children[manager][node] = None
+        self._resize(manager, self.size[node])
+        need = self.size[node] * self.MIN_UNIT
+        width = (self.hi[manager] - self.cursor[manager]) // 2
+        if width >= need:
+            low = self.cursor[manager]
+            self.cursor[manager] += width
+            self._layout(node, low, low + width)
+        else:
+            ancestor = manager
+            while True:
+                if self.hi[ancestor] - self.lo[ancestor] >= self.size[ancestor] * self.MIN_UNIT * 4:
+                    self._layout(ancestor, self.lo[ancestor], self.hi[ancestor])
+                    break
+                if self.parent[ancestor] is None:
+                    self._place_root(ancestor)
+                    break
+                ancestor = self.parent[ancestor]
+        self._refresh_jumps(node)
+
+    def _detach(self, node):
+        manager = self.parent[node]
+        if manager is not None:
+            del self.children[manager][node]
+            self._resize(manager, -self.size[node])
+            self.parent[node] = None
+
+    def add(self, emp_id, manager_id=None):
+        """Adds an employee, under manager_id or as a new root."""
+        self.parent[emp_id] = None
+        self.children[emp_id] = {}
+        self.size[emp_id] = 1
+        if manager_id is None:
+            self._place_root(emp_id)
+            self.jumps[emp_id] = []
+        else:
+            self._attach(emp_id, manager_id)
+
+    def move(self, emp_id, manager_id):
+        """Re-parents an employee with its reports; returns False if that would form a cycle."""
+        if self.parent[emp_id] == manager_id:
+            return True
+        if manager_id is not None and self.contains(emp_id, manager_id):
+            return False
+        self._detach(emp_id)
+        if manager_id is None:
+            self._place_root(emp_id)
+            self._refresh_jumps(emp_id)
+        else:
+            self._attach(emp_id, manager_id)
+        return True
+
+    def remove(self, emp_id):
+        """Drops an employee; its reports move up to its manager with their labels intact."""
+        manager = self.parent.pop(emp_id)
+        reports = self.children.pop(emp_id)
+        if manager is not None:
+            del self.children[manager][emp_id]
+            self._resize(manager, -1)
+        for report in reports:
+            self.parent[report] = manager
+            if manager is not None:
+                self.children[manager][report] = None
+        for table in (self.size, self.lo, self.hi, self.cursor, self.jumps):
+            del table[emp_id]
+        for report in reports:
+            self._refresh_jumps(report)
+
+    def clear(self):
+        """Drops the whole tree."""
+        self.__init__()
+
+    def iter_reports(self, emp_id):
+        """Yields everyone below emp_id, depth first."""
+        stack = list(self.children[emp_id])
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(self.children[current])
+
+    def lowest_common_manager(self, first, second):
+        """Returns the lowest employee that both report up to (or are), or None."""
+        if self.contains(first, second):
+            return first
+        if self.contains(second, first):
+            return second
+        node = first
+        level = len(self.jumps[node]) - 1
+        while level >= 0:
+            jumps = self.jumps[node]
+            if level < len(jumps) and not self.contains(jumps[level], second):
+                node = jumps[level]
+            level -= 1
+        return self.parent[node]
+
+
+class PayrollColumns:
+    """
+    Pay components stored as parallel integer-cent columns.
+
+    Each employee gets a reusable slot in `array` columns for annual salary, recurring
+    bonus, allowance and an interned department code, so a payroll run is one pass over
+    packed columns instead of a walk over catalog tuples. Rates are applied in basis
+    points with integer arithmetic, so totals are exact to the cent.
+    """
+
+    def __init__(self):
+        self.slots = {}
+        self.employee_ids = []
+        self.free_slots = []
+        self.salaries = array("q")
+        self.bonuses = array("q")
+        self.allowances = array("q")
+        self.department_codes = array("I")
+        self.live = bytearray()
+        self.department_names = []
+        self.department_lookup = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _department_code(self, department):
+        code = self.department_lookup.get(department)
+        if code is None:
+            code = len(self.department_names)
+            self.department_names.append(department)
+            self.department_lookup[department] = code
+        return code
+
+    def add(self, details):
+        """Gives an employee a slot with zero pay."""
+        emp_id = details[0]
+        if emp_id in self.slots:
+            return
+        code = self._department_code(details[3])
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.employee_ids[slot] = emp_id
+            self.department_codes[slot] = code
+            self.live[slot] = 1
+        else:
+            slot = len(self.employee_ids)
+            self.employee_ids.append(emp_id)
+            self.salaries.append(0)
+            self.bonuses.append(0)
+            self.allowances.append(0)
+            self.department_codes.append(code)
+            self.live.append(1)
+        self.slots[emp_id] = slot
+
+    def remove(self, details):
+        """Frees an employee's slot."""
+        slot = self.slots.pop(details[0], None)
+        if slot is None:
+            return
+        self.employee_ids[slot] = None
+        self.salaries[slot] = self.bonuses[slot] = self.allowances[slot] = 0
+        self.live[slot] = 0
+        self.free_slots.append(slot)
+
+    def move(self, old_details, new_details):
+        """Follows a department change."""
+        if old_details[3] != new_details[3]:
+            slot = self.slots.get(new_details[0])
+            if slot is not None:
+                self.department_codes[slot] = self._department_code(new_details[3])
+
+    def clear(self):
+        """Drops every slot."""
+        self.__init__()
+
+    def set_pay(self, emp_id, salary_cents, bonus_cents=0, allowance_cents=0):
+        """Sets an employee's pay components; returns False if they have no slot."""
+        slot = self.slots.get(emp_id)
+        if slot is None:
+            return False
+        self.salaries[slot] = salary_cents
+        self.bonuses[slot] = bonus_cents
+        self.allowances[slot] = allowance_cents
+        return True
+
+    def pay_of(self, emp_id):
+        """Returns (salary, bonus, allowance) in cents."""
+        slot = self.slots[emp_id]
+        return self.salaries[slot], self.bonuses[slot], self.allowances[slot]
+
+    def run(self, rule_table, periods, handle=None):
+        """
+        Computes one pay period for every employee and returns the totals.
+
+        `rule_table[code]` is (tax_bp, pension_bp, flat_deduction_cents) for each department
+        code; the flat deduction has its own column and never takes net pay below zero. If
+        `handle` is given, one CSV line per employee is written to it in batches.
+        """
+        labels = [csv_field(name) for name in self.department_names]
+        batch = []
+        employees = total_gross = total_deductions = 0
+        for emp_id, salary, bonus, allowance, code, alive in zip(
+                self.employee_ids, self.salaries, self.bonuses, self.allowances,
+                self.department_codes, self.live):
+            if not alive:
+                continue
+            tax_bp, pension_bp, flat = rule_table[code]
+            gross = salary // periods + bonus + allowance
+            tax = (gross * tax_bp + 5000) // 10000
+            pension = (gross * pension_bp + 5000) // 10000
+            deduction = max(0, min(flat, gross - tax - pension))
+            employees += 1
+            total_gross += gross
+            total_deductions += tax + pension + deduction
+            if handle is not None:
+                batch.append(",".join((str(emp_id), labels[code], format_cents(gross), format_cents(tax),
+                                       format_cents(pension), format_cents(deduction),
+                                       format_cents(gross - tax - pension - deduction))) + "\n")
+                if len(batch) >= 65536:
+                    handle.writelines(batch)
+                    batch = []
+        if handle is not None and batch:
+            handle.writelines(batch)
+        return employees, total_gross, total_deductions
+
+
+def format_cents(cents):
+    """Formats integer cents as a decimal string."""
+    sign = "-" if cents < 0 else ""
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02d}"
+
+
+def csv_field(value):
+    """Quotes a CSV field when it contains a separator, quote or newline."""
+    value = str(value)
+    if any(character in value for character in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
 class EmployeeManagement:
     """
     Employee Management System
@@ -15,6 +650,11 @@ class EmployeeManagement:
     4. Dictionaries: To map employee IDs to their details and manage department assignments.
     """
 
+    # Rates per pay period; departments not listed use the "default" rule
+    DEFAULT_PAYROLL_RULES = {
+        "default": {"tax_rate": 0.20, "pension_rate": 0.05, "flat_deduction": 0.0},
+    }
+
     def __init__(self):
         # List of employees with details (ID, name, age, department, skills)
         self.employees = [
@@ -38,12 +678,39 @@ class EmployeeManagement:
         # Dictionary to map employee IDs to their details
         self.employee_catalog = {emp[0]: emp for emp in self.employees}
 
-        # Dictionary to manage department assignments
-        self.department_assignments = {dept: [] for dept in self.departments}
+        # Dictionary to manage department assignments; members are kept as
+        # insertion-ordered dict keys so add, remove and move are O(1)
+        self.department_assignments = {dept: {} for dept in self.departments}
 
         # Assign employees to departments
         for employee in self.employees:
-            self.department_assignments[employee[3]].append(employee[0])
+            self.department_assignments[employee[3]][employee[0]] = None
+
+        # Skill -> employee bitmaps for boolean skill queries
+        self.skill_index = SkillBitmapIndex()
+        for emp_id, details in self.employee_catalog.items():
+            self.skill_index.add(emp_id, details[4])
+
+        # Ordered field indexes; add hire date here once employees carry it
+        self.age_index = RangeIndex(lambda details: details[2])
+        self.range_indexes = [self.age_index]
+        for index in self.range_indexes:
+            index.add_many(list(self.employee_catalog.values()))
+
+        # Reporting lines; seed employees start without a manager
+        self.hierarchy = ReportingHierarchy()
+        for emp_id in self.employee_catalog:
+            self.hierarchy.add(emp_id)
+
+        # Materialized dashboard counters
+        self.aggregates = OrgAggregates()
+        for details in self.employee_catalog.values():
+            self.aggregates.add(details)
+
+        # Pay components as packed columns; everyone starts at zero pay
+        self.payroll = PayrollColumns()
+        for details in self.employee_catalog.values():
+            self.payroll.add(details)
 
     # List-Related Methods
     def find_employee_index(self, emp_id):
@@ -55,7 +722,17 @@ class EmployeeManagement:
 
     def sort_employees_by_age(self):
         """Sorts employees by age."""
-        return sorted(self.employees, key=lambda emp: emp[2])
+        return list(self.iter_employees_by_age())
+
+    def iter_employees_by_age(self):
+        """Yields employee details in age order without copying the index."""
+        catalog = self.employee_catalog
+        for _, emp_id in self.age_index:
+            yield catalog[emp_id]
+
+    def find_employees_by_age(self, min_age, max_age, department=None):
+        """Lists employee IDs aged min_age..max_age, optionally within one department."""
+        return [emp_id for _, emp_id in self.age_index.between(min_age, max_age, department)]
 
     def reverse_departments(self):
         """Reverses the list of departments."""
@@ -65,7 +742,7 @@ class EmployeeManagement:
         """Appends a new department to the list."""
         if department not in self.departments:
             self.departments.append(department)
-            self.department_assignments[department] = []
+            self.department_assignments[department] = {}
             print(f"Department '{department}' added.")
         else:
             print(f"Department '{department}' already exists.")
@@ -82,8 +759,9 @@ class EmployeeManagement:
     # Tuple-Related Methods
     def find_max_min_age(self):
         """Finds the maximum and minimum age of employees."""
-        ages = [emp[2] for emp in self.employees]
-        return max(ages), min(ages)
+        if not self.age_index:
+            return None, None
+        return self.age_index.max()[0], self.age_index.min()[0]
 
     # Set-Related Methods
     def add_skill(self, skill):
@@ -102,7 +780,123 @@ class EmployeeManagement:
 
     def count_skill_occurrences(self, skill):
         """Counts the occurrences of a specific skill."""
-        return sum(1 for emp in self.employees if skill in emp[4])
+        return self.skill_index.count(skill)
+
+    def query_skills(self, all_of=(), any_of=(), none_of=()):
+        """Finds employees with all of `all_of`, any of `any_of` and none of `none_of`."""
+        return self.skill_index.query(all_of, any_of, none_of)
+
+    def count_skill_query(self, all_of=(), any_of=(), none_of=()):
+        """Counts employees matching a skill query."""
+        return self.skill_index.query_count(all_of, any_of, none_of)
+
+    def find_teams(self, required_skills, departments=None, max_team_size=None, top_n=5, time_budget=0.5):
+        """
+        Finds the smallest teams whose combined skills cover `required_skills`.
+
+        Required skills become bit positions and every candidate a coverage mask; employees
+        with the same mask are interchangeable, and masks contained in another mask can never
+        be needed, so the search runs over the surviving masks only. A greedy cover sets the
+        first bound, then branch-and-bound (branching on the first uncovered skill, pruning
+        with a max-coverage lower bound) looks for up to `top_n` teams until `time_budget`
+        seconds have passed. Teams are ranked by size, then by overlapping skills, and each
+        is a list of employee IDs.
+        """
+        required = list(dict.fromkeys(required_skills))
+        if not required:
+            return []
+        full = (1 << len(required)) - 1
+        allowed = None
+        if departments is not None:
+            allowed = set(departments)
+
+        # Coverage mask per candidate, built from the skill bitmaps
+        masks = {}
+        for bit, skill in enumerate(required):
+            for emp_id in self.skill_index.query(all_of=(skill,)):
+                masks[emp_id] = masks.get(emp_id, 0) | (1 << bit)
+        representatives = {}
+        for emp_id, mask in masks.items():
+            if allowed is not None and self.employee_catalog[emp_id][3] not in allowed:
+                continue
+            if mask not in representatives:
+                representatives[mask] = emp_id
+
+        covered = 0
+        for mask in representatives:
+            covered |= mask
+        if covered != full:
+            missing = [skill for bit, skill in enumerate(required) if not covered >> bit & 1]
+            print(f"No team covers skills: {missing}")
+            return []
+
+        # Drop masks dominated by a wider one
+        candidates = []
+        for mask in sorted(representatives, key=lambda m: -bin(m).count("1")):
+            if not any(mask & kept == mask for kept in candidates):
+                candidates.append(mask)
+        by_bit = [[mask for mask in candidates if mask >> bit & 1] for bit in range(len(required))]
+        widest = bin(candidates[0]).count("1")
+
+        # Greedy cover gives the first bound
+        greedy = []
+        uncovered = full
+        while uncovered:
+            best = max(candidates, key=lambda m: bin(m & uncovered).count("1"))
+            greedy.append(best)
+            uncovered &= ~best
+        limit = max_team_size or len(greedy) + 1
+
+        def rank(team):
+            return (len(team), sum(bin(m).count("1") for m in team) - len(required))
+
+        found = {}
+
+        def keep(team):
+            key = frozenset(team)
+            if key in found:
+                return
+            for skip in range(len(team)):
+                rest = 0
+                for position, other in enumerate(team):
+                    if position != skip:
+                        rest |= other
+                if rest == full:
+                    return
+            found[key] = rank(team)
+            if len(found) > top_n:
+                del found[max(found, key=found.get)]
+
+        if len(greedy) <= limit:
+            keep(greedy)
+        deadline = time.perf_counter() + time_budget
+        nodes = 0
+        exhausted = True
+        stack = [(full, [])]
+        while stack:
+            nodes += 1
+            if nodes & 1023 == 0 and time.perf_counter() > deadline:
+                exhausted = False
+                break
+            uncovered, team = stack.pop()
+            if not uncovered:
+                keep(team)
+                continue
+            bound = limit
+            if len(found) >= top_n:
+                bound = max(found.values())[0]
+            remaining = bin(uncovered).count("1")
+            if len(team) + -(-remaining // widest) > bound:
+                continue
+            bit = (uncovered & -uncovered).bit_length() - 1
+            options = sorted(by_bit[bit], key=lambda m: bin(m & uncovered).count("1"))
+            for mask in options:
+                stack.append((uncovered & ~mask, team + [mask]))
+        if not exhausted:
+            print(f"Team search stopped after {nodes} nodes; returning the best teams found.")
+
+        ranked = sorted(found, key=found.get)
+        return [sorted(representatives[mask] for mask in team) for team in ranked]
 
     def find_common_skills(self, other_skills):
         """Finds common skills between two sets."""
@@ -118,12 +912,17 @@ class EmployeeManagement:
         print("All skills cleared.")
 
     # Dictionary-Related Methods
-    def add_employee(self, emp_id, name, age, department, skills_set):
-        """Adds a new employee."""
-        if emp_id not in self.employee_catalog:
+    def add_employee(self, emp_id, name, age, department, skills_set, manager_id=None):
+        """Adds a new employee, optionally reporting to manager_id."""
+        if manager_id is not None and manager_id not in self.employee_catalog:
+            print(f"Manager ID '{manager_id}' not found.")
+        elif emp_id not in self.employee_catalog:
             self.employee_catalog[emp_id] = (emp_id, name, age, department, skills_set)
-            self.department_assignments[department].append(emp_id)
+            self.department_assignments[department][emp_id] = None
             self.skills.update(skills_set)
+            self.skill_index.add(emp_id, skills_set)
+            self._index_employee(self.employee_catalog[emp_id])
+            self.hierarchy.add(emp_id, manager_id)
             print(f"Employee '{name}' added.")
         else:
             print(f"Employee ID '{emp_id}' already exists.")
@@ -132,7 +931,10 @@ class EmployeeManagement:
         """Removes an employee."""
         if emp_id in self.employee_catalog:
             emp_details = self.employee_catalog.pop(emp_id)
-            self.department_assignments[emp_details[3]].remove(emp_id)
+            del self.department_assignments[emp_details[3]][emp_id]
+            self.skill_index.remove(emp_id, emp_details[4])
+            self._unindex_employee(emp_details)
+            self.hierarchy.remove(emp_id)
             print(f"Employee '{emp_details[1]}' removed.")
         else:
             print(f"Employee ID '{emp_id}' not found.")
@@ -143,11 +945,11 @@ class EmployeeManagement:
 
     def list_employees_by_department(self, department):
         """Lists all employees in a department."""
-        return [emp_id for emp_id in self.department_assignments.get(department, [])]
+        return list(self.department_assignments.get(department, ()))
 
     def count_employees_by_department(self, department):
         """Counts employees in a department."""
-        return len(self.department_assignments.get(department, []))
+        return len(self.department_assignments.get(department, ()))
 
     def update_employee_details(self, emp_id, new_details):
         """Updates employee details."""
@@ -155,22 +957,175 @@ class EmployeeManagement:
             old_department = self.employee_catalog[emp_id][3]
             new_department = new_details[3]
             if old_department != new_department:
-                self.department_assignments[old_department].remove(emp_id)
-                self.department_assignments[new_department].append(emp_id)
+                del self.department_assignments[old_department][emp_id]
+                self.department_assignments[new_department][emp_id] = None
+            self.skill_index.update(emp_id, self.employee_catalog[emp_id][4], new_details[4])
+            self._move_employee(self.employee_catalog[emp_id], new_details)
             self.employee_catalog[emp_id] = new_details
             print(f"Updated details for employee ID '{emp_id}'.")
         else:
             print(f"Employee ID '{emp_id}' not found.")
 
+    def reassign_department(self, emp_ids, new_dept):
+        """Moves a batch of employees into a department and returns how many moved."""
+        if new_dept not in self.department_assignments:
+            print(f"Department '{new_dept}' not found.")
+            return 0
+        catalog = self.employee_catalog
+        assignments = self.department_assignments
+        members = assignments[new_dept]
+        moved = 0
+        missing = 0
+        for emp_id in emp_ids:
+            details = catalog.get(emp_id)
+            if details is None:
+                missing += 1
+                continue
+            old_department = details[3]
+            if old_department == new_dept:
+                continue
+            assignments.get(old_department, {}).pop(emp_id, None)
+            members[emp_id] = None
+            catalog[emp_id] = details[:3] + (new_dept,) + details[4:]
+            self._move_employee(details, catalog[emp_id])
+            moved += 1
+        print(f"Reassigned {moved} employees to '{new_dept}' ({missing} not found).")
+        return moved
+
     def merge_employee_catalogs(self, other_catalog):
         """Merges two employee catalogs."""
+        added = []
         for emp_id, details in other_catalog.items():
             if emp_id not in self.employee_catalog:
                 self.employee_catalog[emp_id] = details
-                self.department_assignments[details[3]].append(emp_id)
+                self.department_assignments[details[3]][emp_id] = None
                 self.skills.update(details[4])
+                self.skill_index.add(emp_id, details[4])
+                self.aggregates.add(details)
+                self.payroll.add(details)
+                self.hierarchy.add(emp_id)
+                added.append(details)
+        for index in self.range_indexes:
+            index.add_many(added)
         print("Employee catalogs merged.")
 
+    def set_manager(self, emp_id, manager_id):
+        """Moves an employee and their reports under a new manager (None for no manager)."""
+        if emp_id not in self.employee_catalog:
+            print(f"Employee ID '{emp_id}' not found.")
+        elif manager_id is not None and manager_id not in self.employee_catalog:
+            print(f"Manager ID '{manager_id}' not found.")
+        elif not self.hierarchy.move(emp_id, manager_id):
+            print(f"Employee ID '{manager_id}' already reports to '{emp_id}'.")
+        else:
+            print(f"Employee ID '{emp_id}' now reports to '{manager_id}'.")
+
+    def get_manager(self, emp_id):
+        """Gets an employee's direct manager."""
+        return self.hierarchy.parent.get(emp_id)
+
+    def list_reports(self, emp_id, direct=False):
+        """Lists the employees under emp_id, or only their direct reports."""
+        if emp_id not in self.hierarchy:
+            return []
+        if direct:
+            return list(self.hierarchy.children[emp_id])
+        return list(self.hierarchy.iter_reports(emp_id))
+
+    def count_reports(self, emp_id):
+        """Counts everyone under emp_id."""
+        return self.hierarchy.size.get(emp_id, 1) - 1
+
+    def reports_to(self, emp_id, manager_id):
+        """Checks whether emp_id is somewhere under manager_id."""
+        if emp_id == manager_id or emp_id not in self.hierarchy or manager_id not in self.hierarchy:
+            return False
+        return self.hierarchy.contains(manager_id, emp_id)
+
+    def find_common_manager(self, first_id, second_id):
+        """Finds the lowest manager shared by two employees."""
+        if first_id not in self.hierarchy or second_id not in self.hierarchy:
+            return None
+        return self.hierarchy.lowest_common_manager(first_id, second_id)
+
+    def _index_employee(self, details):
+        for index in self.range_indexes:
+            index.add(details)
+        self.aggregates.add(details)
+        self.payroll.add(details)
+
+    def _unindex_employee(self, details):
+        for index in self.range_indexes:
+            index.remove(details)
+        self.aggregates.remove(details)
+        self.payroll.remove(details)
+
+    def _move_employee(self, old_details, new_details):
+        for index in self.range_indexes:
+            index.move(old_details, new_details)
+        self.aggregates.move(old_details, new_details)
+        self.payroll.move(old_details, new_details)
+
+    def set_employee_pay(self, emp_id, salary, bonus=0.0, allowance=0.0):
+        """Sets annual salary plus per-period bonus and allowance for an employee."""
+        if self.payroll.set_pay(emp_id, round(salary * 100), round(bonus * 100), round(allowance * 100)):
+            print(f"Pay updated for employee ID '{emp_id}'.")
+        else:
+            print(f"Employee ID '{emp_id}' not found.")
+
+    def get_employee_pay(self, emp_id):
+        """Gets (salary, bonus, allowance) for an employee."""
+        if emp_id not in self.payroll.slots:
+            return "Employee not found."
+        return tuple(cents / 100 for cents in self.payroll.pay_of(emp_id))
+
+    def run_payroll(self, output_path=None, rules=None, periods=12):
+        """
+        Runs one pay period for every employee and streams rows to a CSV file.
+
+        `rules` maps a department to tax_rate, pension_rate and flat_deduction overrides on
+        top of DEFAULT_PAYROLL_RULES["default"]. Salaries are annual and divided by `periods`.
+        Returns a summary with totals in currency units.
+        """
+        started = time.perf_counter()
+        rules = dict(rules or {})
+        base = dict(self.DEFAULT_PAYROLL_RULES["default"])
+        base.update(rules.pop("default", {}))
+        rule_table = []
+        for department in self.payroll.department_names:
+            rule = dict(base)
+            rule.update(self.DEFAULT_PAYROLL_RULES.get(department, {}))
+            rule.update(rules.get(department, {}))
+            rule_table.append((round(rule["tax_rate"] * 10000), round(rule["pension_rate"] * 10000),
+                               round(rule["flat_deduction"] * 100)))
+
+        if output_path is None:
+            employees, gross, deductions = self.payroll.run(rule_table, periods)
+        else:
+            with open(output_path, "w", newline="") as handle:
+                handle.write("employee_id,department,gross,tax,pension,flat_deduction,net\n")
+                employees, gross, deductions = self.payroll.run(rule_table, periods, handle)
+        summary = {
+            "employees": employees,
+            "gross": gross / 100,
+            "deductions": deductions / 100,
+            "net": (gross - deductions) / 100,
+            "seconds": time.perf_counter() - started,
+        }
+        print(f"Payroll run for {employees} employees.")
+        return summary
+
+    def get_org_dashboard(self):
+        """Returns live read-only headcount, skill frequency and age histogram views."""
+        return self.aggregates.snapshot()
+
+    def verify_org_dashboard(self, rebuild=False):
+        """Checks the dashboard counters against the catalog, optionally rebuilding them."""
+        consistent = self.aggregates.verify(self.employee_catalog, rebuild)
+        if not consistent:
+            print("Dashboard counters were out of date" + (" and have been rebuilt." if rebuild else "."))
+        return consistent
+
     def get_all_employee_ids(self):
         """Gets all employee IDs."""
         return list(self.employee_catalog.keys())
@@ -179,7 +1134,13 @@ class EmployeeManagement:
         """Clears the employee catalog."""
         self.employee_catalog.clear()
         for dept in self.department_assignments:
-            self.department_assignments[dept] = []
+            self.department_assignments[dept] = {}
+        self.skill_index.clear()
+        for index in self.range_indexes:
+            index.clear()
+        self.aggregates.clear()
+        self.payroll.clear()
+        self.hierarchy.clear()
         print("Employee catalog cleared.")
 
 # Example usage
@@ -198,7 +1159,7 @@ if __name__ == "__main__":
 
     print("\nDepartment Assignments:")
     for dept, emp_ids in emp_mgmt.department_assignments.items():
-        print(f"{dept}: {emp_ids}")
+        print(f"{dept}: {list(emp_ids)}")
 
     # Add and remove employees
     emp_mgmt.add_employee(6, "Frank", 29, "Marketing", {"SEO", "Content Writing"})
@@ -237,6 +1198,10 @@ if __name__ == "__main__":
     for emp in emp_mgmt.sort_employees_by_age():
         print(emp)
 
+    # Range query on the age index
+    print("\nEmployees aged 25-35 in IT:")
+    print(emp_mgmt.find_employees_by_age(25, 35, "IT"))
+
     # Reverse the list of departments
     print("\nReversed List of Departments:")
     print(emp_mgmt.reverse_departments())
@@ -269,11 +1234,53 @@ if __name__ == "__main__":
     for emp_id, details in emp_mgmt.employee_catalog.items():
         print(f"{emp_id}: {details}")
 
+    # Boolean skill queries answered from the skill bitmaps
+    print("\nEmployees with Python but not Accounting:")
+    print(emp_mgmt.query_skills(all_of={"Python"}, none_of={"Accounting"}))
+    print("Employees with Recruitment or Security:")
+    print(emp_mgmt.query_skills(any_of={"Recruitment", "Security"}))
+    print(f"Count with Python: {emp_mgmt.count_skill_query(all_of={'Python'})}")
+
+    # Smallest teams covering a set of required skills
+    print("\nTeams covering Python, Security and Recruitment:")
+    for team in emp_mgmt.find_teams({"Python", "Security", "Recruitment"}):
+        print(team)
+
+    # Reporting lines
+    emp_mgmt.set_manager(2, 4)
+    emp_mgmt.set_manager(7, 4)
+    emp_mgmt.set_manager(4, 5)
+    emp_mgmt.set_manager(8, 5)
+    print(f"\nReports under 5: {emp_mgmt.list_reports(5)} ({emp_mgmt.count_reports(5)} people)")
+    print(f"Does 2 report to 5? {emp_mgmt.reports_to(2, 5)}")
+    print(f"Common manager of 2 and 8: {emp_mgmt.find_common_manager(2, 8)}")
+
+    # Payroll over the packed pay columns
+    emp_mgmt.set_employee_pay(1, 60000, allowance=200)
+    emp_mgmt.set_employee_pay(2, 72000, bonus=500)
+    emp_mgmt.set_employee_pay(4, 90000)
+    payroll_rules = {"IT": {"pension_rate": 0.08}, "HR": {"flat_deduction": 25}}
+    import os
+    import tempfile
+    with tempfile.TemporaryDirectory() as payroll_dir:
+        summary = emp_mgmt.run_payroll(os.path.join(payroll_dir, "payroll.csv"), payroll_rules)
+    print(f"Payroll Totals: gross {summary['gross']}, deductions {summary['deductions']}, net {summary['net']}")
+
+    # Dashboard counters maintained incrementally
+    dashboard = emp_mgmt.get_org_dashboard()
+    print(f"\nHeadcount: {dict(dashboard['headcount'])}")
+    print(f"Age Histogram: {dict(sorted(dashboard['age_histogram'].items()))}")
+    print(f"Dashboard consistent: {emp_mgmt.verify_org_dashboard()}")
+
     # Append a new department to the list
     emp_mgmt.append_department("Legal")
     print("\nUpdated List of Departments:")
     print(emp_mgmt.departments)
 
+    # Move several employees in one call
+    emp_mgmt.reassign_department([7, 8, 99], "Legal")
+    print(f"Employees in Legal: {emp_mgmt.list_employees_by_department('Legal')}")
+
     # Remove a department from the list
     emp_mgmt.remove_department("Marketing")
     print("\nUpdated List of Departments After Removal:")
@@ -1,5 +1,380 @@
 # library_management.py
 
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import deque
+from datetime import date, timedelta
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_tokens(text):
+    """Lowercases, strips accents and splits text into word tokens."""
+    text = str(text).lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(character for character in text if not unicodedata.combining(character))
+    return TOKEN_PATTERN.findall(text)
+
+
+def trigrams(token):
+    """Returns the padded character trigrams of a token."""
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CatalogSearchIndex:
+    """
+    Inverted index over book titles and authors.
+
+    Each book gets a reusable integer document ID; postings map a token to the
+    documents containing it with a field weight (title matches count double). The
+    vocabulary is also kept as a sorted list for prefix autocomplete (new tokens are
+    buffered and merged in on the next prefix lookup, so bulk loads sort once) and as a
+    trigram -> tokens map so misspelled query words can be matched to nearby tokens.
+    """
+
+    TITLE_WEIGHT = 2.0
+    AUTHOR_WEIGHT = 1.0
+    PREFIX_FACTOR = 0.8
+    FUZZY_FACTOR = 0.9
+    FUZZY_THRESHOLD = 0.5
+    MAX_EXPANSIONS = 50
+
+    def __init__(self):
+        self.documents = {}
+        self.titles = []
+        self.free_documents = []
+        self.document_tokens = []
+        self.postings = {}
+        self.vocabulary = []
+        self.pending_tokens = set()
+        self.trigram_tokens = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _weights(self, title, author):
+        weights = {}
+        for token in normalize_tokens(author):
+            weights[token] = max(weights.get(token, 0.0), self.AUTHOR_WEIGHT)
+        for token in normalize_tokens(title):
+            weights[token] = self.TITLE_WEIGHT
+        return weights
+
+    def add(self, title, author):
+        """Indexes a book's title and author."""
+        if title in self.documents:
+            self.remove(title)
+        if self.free_documents:
+            document = self.free_documents.pop()
+            self.titles[document] = title
+        else:
+            document = len(self.titles)
+            self.titles.append(title)
+            self.document_tokens.append(None)
+        self.documents[title] = document
+        weights = self._weights(title, author)
+        self.document_tokens[document] = tuple(weights)
+        for token, weight in weights.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                self.pending_tokens.add(token)
+                for trigram in trigrams(token):
+                    self.trigram_tokens.setdefault(trigram, set()).add(token)
+            postings[document] = weight
+
+    def remove(self, title):
+        """Drops a book from the index."""
+        document = self.documents.pop(title, None)
+        if document is None:
+            return
+        for token in self.document_tokens[document]:
+            postings = self.postings[token]
+            del postings[document]
+            if not postings:
+                del self.postings[token]
+                if token in self.pending_tokens:
+                    self.pending_tokens.discard(token)
+                else:
+                    del self.vocabulary[bisect_left(self.vocabulary, token)]
+                for trigram in trigrams(token):
+                    tokens = self.trigram_tokens[trigram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self.trigram_tokens[trigram]
+        self.titles[document] = None
+        self.document_tokens[document] = None
+        self.free_documents.append(document)
+
+    def clear(self):
+        """Drops every document."""
+        self.__init__()
+
+    def prefix_matches(self, prefix):
+        """Returns up to MAX_EXPANSIONS vocabulary tokens starting with prefix, most common first."""
+        if self.pending_tokens:
+            self.vocabulary.extend(self.pending_tokens)
+            self.vocabulary.sort()
+            self.pending_tokens.clear()
+        vocabulary = self.vocabulary
+        position = bisect_left(vocabulary, prefix)
+        matches = []
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            matches.append(vocabulary[position])
+            position += 1
+            if len(matches) >= self.MAX_EXPANSIONS * 4:
+                break
+        return heapq.nlargest(self.MAX_EXPANSIONS, matches, key=lambda token: len(self.postings[token]))
+
+    def fuzzy_matches(self, token):
+        """Returns (token, similarity) pairs for vocabulary tokens with similar trigrams."""
+        query_grams = trigrams(token)
+        overlaps = {}
+        for trigram in query_grams:
+            for candidate in self.trigram_tokens.get(trigram, ()):
+                if abs(len(candidate) - len(token)) <= 2:
+                    overlaps[candidate] = overlaps.get(candidate, 0) + 1
+        matches = []
+        for candidate, overlap in overlaps.items():
+            similarity = 2.0 * overlap / (len(query_grams) + len(candidate))
+            if similarity >= self.FUZZY_THRESHOLD:
+                matches.append((candidate, similarity))
+        return heapq.nlargest(self.MAX_EXPANSIONS, matches, key=lambda match: match[1])
+
+    def _expand(self, token, prefix):
+        expansions = {}
+        if token in self.postings:
+            expansions[token] = 1.0
+        if prefix:
+            for match in self.prefix_matches(token):
+                expansions.setdefault(match, self.PREFIX_FACTOR)
+        if not expansions:
+            for match, similarity in self.fuzzy_matches(token):
+                expansions[match] = similarity * self.FUZZY_FACTOR
+        return expansions
+
+    def search(self, query, limit=10, prefix=False):
+        """
+        Returns up to `limit` (title, score) hits ranked by matched words, then score.
+
+        Unknown words fall back to trigram fuzzy matches; with `prefix`, the last word
+        also matches any token it starts.
+        """
+        tokens = normalize_tokens(query)
+        if not tokens:
+            return []
+        matched = {}
+        scores = {}
+        for position, token in enumerate(tokens):
+            best = {}
+            expansions = self._expand(token, prefix and position == len(tokens) - 1)
+            for match, factor in expansions.items():
+                for document, weight in self.postings[match].items():
+                    score = factor * weight
+                    if score > best.get(document, 0.0):
+                        best[document] = score
+            for document, score in best.items():
+                matched[document] = matched.get(document, 0) + 1
+                scores[document] = scores.get(document, 0.0) + score
+        ranked = heapq.nlargest(limit, scores, key=lambda document: (matched[document], scores[document]))
+        return [(self.titles[document], round(scores[document], 3)) for document in ranked]
+
+
+class HoldQueue:
+    """
+    Hold queue for one title: FIFO within each priority tier, lower tiers served first.
+
+    Each tier keeps a deque of (sequence, user) and a Fenwick tree over sequence numbers
+    holding 1 for every live hold, so a patron's position is the live holds in better
+    tiers plus a prefix sum in their own tier, O(tiers + log n), with no scan. Cancelled
+    holds are zeroed in the tree and skipped lazily when they reach the front.
+    """
+
+    def __init__(self):
+        self.tiers = {}
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, user):
+        return user in self.entries
+
+    @staticmethod
+    def _prefix(tree, index):
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    @staticmethod
+    def _update(tree, index, delta):
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def push(self, user, tier):
+        """Queues a user at the back of their tier."""
+        state = self.tiers.get(tier)
+        if state is None:
+            state = self.tiers[tier] = [deque(), [0], 0]
+        queue, tree, _ = state
+        sequence = len(tree)
+        tree.append(1 + self._prefix(tree, sequence - 1) - self._prefix(tree, sequence - (sequence & -sequence)))
+        queue.append((sequence, user))
+        state[2] += 1
+        self.entries[user] = (tier, sequence)
+
+    def _drop(self, tier, sequence):
+        state = self.tiers[tier]
+        self._update(state[1], sequence, -1)
+        state[2] -= 1
+        if not state[2]:
+            del self.tiers[tier]
+
+    def pop(self):
+        """Removes and returns the next user to serve, or None."""
+        while self.tiers:
+            tier = min(self.tiers)
+            queue = self.tiers[tier][0]
+            while queue:
+                sequence, user = queue.popleft()
+                if self.entries.get(user) == (tier, sequence):
+                    del self.entries[user]
+                    self._drop(tier, sequence)
+                    return user
+        return None
+
+    def cancel(self, user):
+        """Withdraws a user's hold; returns False if they had none."""
+        entry = self.entries.pop(user, None)
+        if entry is None:
+            return False
+        self._drop(*entry)
+        return True
+
+    def position(self, user):
+        """Returns a user's 1-based place in line, or None."""
+        entry = self.entries.get(user)
+        if entry is None:
+            return None
+        tier, sequence = entry
+        ahead = sum(state[2] for other, state in self.tiers.items() if other < tier)
+        return ahead + self._prefix(self.tiers[tier][1], sequence)
+
+
+class CoCheckoutRecommender:
+    """
+    "Patrons who borrowed this also borrowed" from loan history.
+
+    Titles are interned to integer IDs. Each patron's distinct titles form a basket
+    (capped at `max_basket` most recent), and every new title in a basket bumps a sparse
+    symmetric co-occurrence row per title. Rows are ranked by cosine similarity
+    (co-borrowers / sqrt(borrowers_a * borrowers_b)) into a top-N table of packed
+    `array` pairs, which is all that online queries read. `refresh` consumes only the
+    loans added since the last run and re-ranks just the titles they touched and
+    those titles' neighbours.
+    """
+
+    def __init__(self, top_n=20, max_basket=200):
+        self.top_n = top_n
+        self.max_basket = max_basket
+        self.clear()
+
+    def clear(self):
+        """Drops the matrix, the table and the history cursor."""
+        self.title_ids = {}
+        self.titles = []
+        self.baskets = {}
+        self.borrowers = array("I")
+        self.counts = []
+        self.neighbors = {}
+        self.scores = {}
+        self.cursor = 0
+
+    def _title_id(self, title):
+        title_id = self.title_ids.get(title)
+        if title_id is None:
+            title_id = len(self.titles)
+            self.title_ids[title] = title_id
+            self.titles.append(title)
+            self.borrowers.append(0)
+            self.counts.append({})
+        return title_id
+
+    def _observe(self, user, title, borrowed):
+        title_id = self._title_id(title)
+        basket = self.baskets.setdefault(user, {})
+        if title_id in basket:
+            return
+        counts = self.counts
+        row = counts[title_id]
+        for other in basket:
+            row[other] = row.get(other, 0) + 1
+            other_row = counts[other]
+            other_row[title_id] = other_row.get(title_id, 0) + 1
+        basket[title_id] = None
+        if len(basket) > self.max_basket:
+            del basket[next(iter(basket))]
+        self.borrowers[title_id] += 1
+        borrowed.add(title_id)
+
+    def _rank(self, title_id):
+        borrowers = self.borrowers
+        base = borrowers[title_id]
+        scored = ((count / math.sqrt(base * borrowers[other]), other)
+                  for other, count in self.counts[title_id].items())
+        best = heapq.nlargest(self.top_n, scored)
+        self.neighbors[title_id] = array("I", [other for _, other in best])
+        self.scores[title_id] = array("f", [score for score, _ in best])
+
+    def refresh(self, history):
+        """Folds loans after the cursor into the matrix and re-ranks touched titles."""
+        borrowed = set()
+        for position in range(self.cursor, len(history)):
+            user, title = history[position]
+            self._observe(user, title, borrowed)
+        self.cursor = len(history)
+        # A title's borrower count feeds every score in its neighbours' rows too
+        dirty = set(borrowed)
+        for title_id in borrowed:
+            dirty.update(self.counts[title_id])
+        for title_id in dirty:
+            self._rank(title_id)
+        return len(dirty)
+
+    def rebuild(self, history):
+        """Rebuilds the matrix and table from the full history."""
+        self.clear()
+        return self.refresh(history)
+
+    def recommend(self, title, limit=10, keep=None):
+        """
+        Returns up to `limit` (title, score) neighbours from the precomputed table.
+
+        If `keep` is given, neighbours whose title it rejects are skipped and the next ones in
+        the table take their place.
+        """
+        title_id = self.title_ids.get(title)
+        if title_id is None or title_id not in self.neighbors:
+            return []
+        titles = self.titles
+        hits = []
+        for other, score in zip(self.neighbors[title_id], self.scores[title_id]):
+            if len(hits) >= limit:
+                break
+            if keep is None or keep(titles[other]):
+                hits.append((titles[other], round(score, 3)))
+        return hits
+
+
 class LibraryManagement:
     """
     Library Management System
@@ -108,6 +483,15 @@ class LibraryManagement:
     18. clear_member_catalog(): Clears the member catalog.
     """
 
+    # Loan period and overdue fines (in cents per day, capped per loan)
+    LOAN_DAYS = 14
+    FINE_CENTS_PER_DAY = 25
+    MAX_FINE_CENTS = 2000
+
+    # Hold priority by membership type (lower is served first) and days to collect a hold
+    HOLD_TIERS = {"Premium": 0, "Standard": 1}
+    HOLD_PICKUP_DAYS = 7
+
     def __init__(self):
         # List of books in the library with genres
         self.books = [
@@ -139,8 +523,51 @@ class LibraryManagement:
         # Dictionary to map book titles to their details
         self.library_catalog = {title: (author, year, genre) for title, author, year, genre in self.books}
 
-        # Dictionary to manage user checkouts
-        self.user_checkouts = {user: [] for user in self.users}
+        # Circulation: copies per title, open loans by ID, and forward (user -> title -> loan)
+        # and reverse (title -> user -> loan) indexes so checkout and return are O(1)
+        self.copies = {title: 1 for title in self.library_catalog}
+        self.loans = {}
+        self.next_loan_id = 1
+        self.user_checkouts = {user: {} for user in self.users}
+        self.title_borrowers = {}
+
+        # Due dates: a min-heap of (due date, loan ID) with lazy deletion of returned or
+        # renewed loans, the loans already reported overdue, and settled fines per user
+        self.due_heap = []
+        self.overdue_loans = {}
+        self.user_fines = {}
+
+        # Holds: a queue per title, copies set aside for pickup (title -> user -> deadline),
+        # and a min-heap of pickup deadlines (stale entries are skipped when they surface)
+        self.user_memberships = {}
+        self.hold_queues = {}
+        self.ready_holds = {}
+        self.pickup_deadlines = []
+
+        # Append-only (user, title) loan history feeding the recommender
+        self.loan_history = []
+        self.recommender = CoCheckoutRecommender()
+
+        # Search and lookup indexes over the catalog
+        self.search_index = CatalogSearchIndex()
+        self.author_index = {}
+        self.genre_index = {}
+        for title, details in self.library_catalog.items():
+            self._index_book(title, details)
+
+    def _index_book(self, title, details):
+        self.search_index.add(title, details[0])
+        self.author_index.setdefault(details[0], {})[title] = None
+        self.genre_index.setdefault(details[2], {})[title] = None
+
+    def _unindex_book(self, title, details):
+        self.search_index.remove(title)
+        for index, key in ((self.author_index, details[0]), (self.genre_index, details[2])):
+            titles = index.get(key)
+            if titles is not None:
+                titles.pop(title, None)
+                if not titles:
+                    del index[key]
 
     # List-Related Methods
     def find_book_index(self, title):
@@ -161,6 +588,7 @@ class LibraryManagement:
     def append_user(self, user):
         """Appends a new user to the list."""
         self.users.append(user)
+        self.user_checkouts.setdefault(user, {})
         print(f"User '{user}' added.")
 
     def remove_user(self, user):
@@ -203,11 +631,13 @@ class LibraryManagement:
         print("All genres cleared.")
 
     # Dictionary-Related Methods
-    def add_book(self, title, author, year, genre):
+    def add_book(self, title, author, year, genre, copies=1):
         """Adds a new book to the library."""
         if title not in self.library_catalog:
             self.library_catalog[title] = (author, year, genre)
+            self.copies[title] = copies
             self.genres.add(genre)
+            self._index_book(title, self.library_catalog[title])
             print(f"Book '{title}' added.")
         else:
             print(f"Book '{title}' already exists.")
@@ -216,6 +646,10 @@ class LibraryManagement:
         """Removes a book from the library."""
         if title in self.library_catalog:
             book_details = self.library_catalog.pop(title)
+            self.copies.pop(title, None)
+            self.hold_queues.pop(title, None)
+            self.ready_holds.pop(title, None)
+            self._unindex_book(title, book_details)
             print(f"Book '{title}' removed.")
         else:
             print(f"Book '{title}' not found.")
@@ -226,36 +660,278 @@ class LibraryManagement:
 
     def list_books_by_author(self, author):
         """Lists all books by an author."""
-        return [title for title, details in self.library_catalog.items() if details[0] == author]
+        return list(self.author_index.get(author, ()))
 
     def list_books_by_genre(self, genre):
         """Lists all books in a genre."""
-        return [title for title, details in self.library_catalog.items() if details[2] == genre]
+        return list(self.genre_index.get(genre, ()))
 
     def count_books_by_author(self, author):
         """Counts books by an author."""
-        return sum(1 for title, details in self.library_catalog.items() if details[0] == author)
-
-    def checkout_book(self, user, book_title):
+        return len(self.author_index.get(author, ()))
+
+    def search_books(self, query, limit=10):
+        """Finds books whose title or author matches the query, tolerating typos."""
+        return self.search_index.search(query, limit)
+
+    def autocomplete_books(self, partial_query, limit=10):
+        """Suggests books for a partially typed title or author."""
+        return [title for title, _ in self.search_index.search(partial_query, limit, prefix=True)]
+
+    def available_copies(self, book_title):
+        """Counts the copies of a title that are on the shelf and not set aside for a hold."""
+        return (self.copies.get(book_title, 0) - len(self.title_borrowers.get(book_title, ()))
+                - len(self.ready_holds.get(book_title, ())))
+
+    def add_copies(self, book_title, count):
+        """Adds (or with a negative count, withdraws) copies of a title."""
+        if book_title not in self.library_catalog:
+            print(f"Book '{book_title}' not found.")
+        elif self.available_copies(book_title) + count < 0:
+            print(f"Only {self.available_copies(book_title)} copies of '{book_title}' are on the shelf.")
+        else:
+            self.copies[book_title] += count
+            print(f"'{book_title}' now has {self.copies[book_title]} copies.")
+            self._allocate_holds(book_title)
+
+    def list_borrowers(self, book_title):
+        """Lists the users currently holding a title."""
+        return list(self.title_borrowers.get(book_title, ()))
+
+    def _checkout(self, user, book_title, on=None):
+        """Opens a loan and returns None, or returns why it was refused."""
+        if book_title not in self.library_catalog or user not in self.user_checkouts:
+            return "Book or user not found."
+        if book_title in self.user_checkouts[user]:
+            return f"{user} already has {book_title}."
+        ready = self.ready_holds.get(book_title)
+        if ready is not None and user in ready:
+            del ready[user]
+            if not ready:
+                del self.ready_holds[book_title]
+        elif self.available_copies(book_title) <= 0:
+            return f"No copies of {book_title} are available."
+        loan_id = self.next_loan_id
+        self.next_loan_id += 1
+        loaned_on = on or date.today()
+        due_on = loaned_on + timedelta(days=self.LOAN_DAYS)
+        self.loans[loan_id] = (user, book_title, loaned_on, due_on)
+        heapq.heappush(self.due_heap, (due_on, loan_id))
+        self.loan_history.append((user, book_title))
+        self.user_checkouts[user][book_title] = loan_id
+        self.title_borrowers.setdefault(book_title, {})[user] = loan_id
+        return None
+
+    def _return(self, user, book_title, on=None):
+        """Closes a loan and returns None, or returns why it could not be found."""
+        loan_id = self.user_checkouts.get(user, {}).pop(book_title, None)
+        if loan_id is None:
+            return "Book or user not found."
+        loan = self.loans.pop(loan_id)
+        fine = self._fine_cents(loan[3], on or date.today())
+        if fine:
+            self.user_fines[user] = self.user_fines.get(user, 0) + fine
+        self.overdue_loans.pop(loan_id, None)
+        borrowers = self.title_borrowers[book_title]
+        del borrowers[user]
+        if not borrowers:
+            del self.title_borrowers[book_title]
+        self._allocate_holds(book_title, on)
+        return None
+
+    def checkout_book(self, user, book_title, on=None):
         """Checks out a book to a user."""
-        if book_title in self.library_catalog and user in self.user_checkouts:
-            self.user_checkouts[user].append(book_title)
+        refusal = self._checkout(user, book_title, on)
+        if refusal is None:
             print(f"{user} checked out {book_title}.")
         else:
-            print(f"Book or user not found.")
+            print(refusal)
 
-    def return_book(self, user, book_title):
-        """Returns a book from a user."""
-        if user in self.user_checkouts and book_title in self.user_checkouts[user]:
-            self.user_checkouts[user].remove(book_title)
+    def return_book(self, user, book_title, on=None):
+        """Returns a book from a user, settling any overdue fine."""
+        problem = self._return(user, book_title, on)
+        if problem is None:
             print(f"{user} returned {book_title}.")
         else:
-            print(f"Book or user not found.")
+            print(problem)
+
+    def checkout_books(self, requests, on=None):
+        """Checks out a batch of (user, title) pairs; returns the refused pairs with reasons."""
+        completed = 0
+        refused = []
+        for user, book_title in requests:
+            refusal = self._checkout(user, book_title, on)
+            if refusal is None:
+                completed += 1
+            else:
+                refused.append((user, book_title, refusal))
+        print(f"Checked out {completed} books ({len(refused)} refused).")
+        return refused
+
+    def return_books(self, requests, on=None):
+        """Returns a batch of (user, title) pairs; returns the pairs that were not on loan."""
+        completed = 0
+        unmatched = []
+        for user, book_title in requests:
+            problem = self._return(user, book_title, on)
+            if problem is None:
+                completed += 1
+            else:
+                unmatched.append((user, book_title, problem))
+        print(f"Returned {completed} books ({len(unmatched)} not found).")
+        return unmatched
+
+    def _fine_cents(self, due_on, on):
+        days_late = (on - due_on).days
+        if days_late <= 0:
+            return 0
+        return min(days_late * self.FINE_CENTS_PER_DAY, self.MAX_FINE_CENTS)
+
+    def renew_book(self, user, book_title, on=None):
+        """Extends a loan by another loan period from today, unless it is already overdue."""
+        loan_id = self.user_checkouts.get(user, {}).get(book_title)
+        if loan_id is None:
+            print("Book or user not found.")
+            return
+        today = on or date.today()
+        user, book_title, loaned_on, due_on = self.loans[loan_id]
+        if due_on < today:
+            print(f"{book_title} is overdue and cannot be renewed.")
+            return
+        due_on = today + timedelta(days=self.LOAN_DAYS)
+        self.loans[loan_id] = (user, book_title, loaned_on, due_on)
+        self.overdue_loans.pop(loan_id, None)
+        heapq.heappush(self.due_heap, (due_on, loan_id))
+        print(f"{user} renewed {book_title} until {due_on}.")
+
+    def process_overdue(self, on=None):
+        """
+        Pops loans that fell due before `on` and returns the newly overdue (loan_id, user, title, due).
+
+        Only loans that became overdue since the last run are touched; heap entries for
+        returned or renewed loans are discarded as they surface.
+        """
+        today = on or date.today()
+        heap = self.due_heap
+        loans = self.loans
+        newly_overdue = []
+        while heap and heap[0][0] < today:
+            due_on, loan_id = heapq.heappop(heap)
+            loan = loans.get(loan_id)
+            if loan is None or loan[3] != due_on:
+                continue
+            self.overdue_loans[loan_id] = due_on
+            newly_overdue.append((loan_id, loan[0], loan[1], due_on))
+        print(f"{len(newly_overdue)} loans became overdue ({len(self.overdue_loans)} overdue in total).")
+        return newly_overdue
+
+    def set_membership(self, user, membership_type):
+        """Sets the membership type that decides a user's hold priority."""
+        self.user_memberships[user] = membership_type
+        print(f"{user} is now a {membership_type} member.")
+
+    def _allocate_holds(self, book_title, on=None):
+        """Sets free copies aside for the front of the hold queue."""
+        queue = self.hold_queues.get(book_title)
+        while queue and self.available_copies(book_title) > 0:
+            user = queue.pop()
+            deadline = (on or date.today()) + timedelta(days=self.HOLD_PICKUP_DAYS)
+            self.ready_holds.setdefault(book_title, {})[user] = deadline
+            heapq.heappush(self.pickup_deadlines, (deadline, book_title, user))
+            print(f"Hold on {book_title} is ready for {user} until {deadline}.")
+        if queue is not None and not queue:
+            del self.hold_queues[book_title]
+
+    def place_hold(self, user, book_title):
+        """Queues a user for the next free copy of a title."""
+        if book_title not in self.library_catalog or user not in self.user_checkouts:
+            print("Book or user not found.")
+        elif book_title in self.user_checkouts[user] or user in self.ready_holds.get(book_title, ()):
+            print(f"{user} already has {book_title}.")
+        elif user in self.hold_queues.get(book_title, ()):
+            print(f"{user} is already waiting for {book_title}.")
+        elif self.available_copies(book_title) > 0:
+            print(f"{book_title} is on the shelf; no hold needed.")
+        else:
+            tier = self.HOLD_TIERS.get(self.user_memberships.get(user), max(self.HOLD_TIERS.values()))
+            queue = self.hold_queues.setdefault(book_title, HoldQueue())
+            queue.push(user, tier)
+            print(f"{user} placed a hold on {book_title} (position {queue.position(user)}).")
+
+    def cancel_hold(self, user, book_title, on=None):
+        """Cancels a queued hold or releases a copy set aside for the user."""
+        queue = self.hold_queues.get(book_title)
+        ready = self.ready_holds.get(book_title)
+        if queue is not None and queue.cancel(user):
+            if not queue:
+                del self.hold_queues[book_title]
+        elif ready is not None and user in ready:
+            del ready[user]
+            if not ready:
+                del self.ready_holds[book_title]
+            self._allocate_holds(book_title, on)
+        else:
+            print(f"{user} has no hold on {book_title}.")
+            return
+        print(f"{user} cancelled the hold on {book_title}.")
+
+    def get_hold_position(self, user, book_title):
+        """Returns a user's place in the hold queue for a title (0 if a copy is ready), or None."""
+        if user in self.ready_holds.get(book_title, ()):
+            return 0
+        queue = self.hold_queues.get(book_title)
+        return queue.position(user) if queue is not None else None
+
+    def expire_holds(self, on=None):
+        """Releases copies whose pickup deadline has passed and passes them down the queue."""
+        today = on or date.today()
+        expired = []
+        while self.pickup_deadlines and self.pickup_deadlines[0][0] < today:
+            deadline, book_title, user = heapq.heappop(self.pickup_deadlines)
+            ready = self.ready_holds.get(book_title)
+            if ready is None or ready.get(user) != deadline:
+                continue
+            del ready[user]
+            if not ready:
+                del self.ready_holds[book_title]
+            expired.append((user, book_title))
+            self._allocate_holds(book_title, today)
+        print(f"{len(expired)} holds expired.")
+        return expired
+
+    def build_recommendations(self):
+        """Batch job: rebuilds the co-checkout matrix from the whole loan history."""
+        titles = self.recommender.rebuild(self.loan_history)
+        print(f"Recommendations built for {titles} titles from {len(self.loan_history)} loans.")
+
+    def refresh_recommendations(self):
+        """Folds loans made since the last build or refresh into the recommendations."""
+        new_loans = len(self.loan_history) - self.recommender.cursor
+        titles = self.recommender.refresh(self.loan_history)
+        print(f"Recommendations refreshed for {titles} titles from {new_loans} new loans.")
+
+    def recommend_books(self, book_title, limit=5):
+        """Lists titles often borrowed by patrons who borrowed this one."""
+        return self.recommender.recommend(book_title, limit, self.library_catalog.__contains__)
+
+    def list_overdue_loans(self):
+        """Lists the IDs of loans reported overdue and not yet returned."""
+        return list(self.overdue_loans)
+
+    def get_user_fines(self, user, on=None):
+        """Returns a user's settled fines plus fines accruing on open overdue loans."""
+        today = on or date.today()
+        total = self.user_fines.get(user, 0)
+        for loan_id in self.user_checkouts.get(user, {}).values():
+            total += self._fine_cents(self.loans[loan_id][3], today)
+        return total / 100
 
     def update_book_details(self, title, new_details):
         """Updates book details."""
         if title in self.library_catalog:
+            self._unindex_book(title, self.library_catalog[title])
             self.library_catalog[title] = new_details
+            self._index_book(title, new_details)
             print(f"Updated details for book '{title}'.")
         else:
             print(f"Book '{title}' not found.")
@@ -265,7 +941,9 @@ class LibraryManagement:
         for title, details in other_catalog.items():
             if title not in self.library_catalog:
                 self.library_catalog[title] = details
+                self.copies[title] = 1
                 self.genres.add(details[2])
+                self._index_book(title, details)
         print("Library catalogs merged.")
 
     def get_all_book_titles(self):
@@ -275,6 +953,12 @@ class LibraryManagement:
     def clear_library_catalog(self):
         """Clears the library catalog."""
         self.library_catalog.clear()
+        self.copies.clear()
+        self.hold_queues.clear()
+        self.ready_holds.clear()
+        self.search_index.clear()
+        self.author_index.clear()
+        self.genre_index.clear()
         print("Library catalog cleared.")
 
 # Example usage
@@ -290,7 +974,7 @@ if __name__ == "__main__":
 
     print("\nUser Checkouts:")
     for user, checkouts in library.user_checkouts.items():
-        print(f"{user}: {checkouts}")
+        print(f"{user}: {list(checkouts)}")
 
     # Add and remove books
     library.add_book("The Alchemist", "Paulo Coelho", 1988, "Fiction")
@@ -328,9 +1012,43 @@ if __name__ == "__main__":
     library.checkout_book("Alice", "The Great Gatsby")
     library.return_book("Alice", "The Great Gatsby")
 
+    # Copy-aware circulation with bulk kiosk operations
+    library.add_copies("The Hobbit", 1)
+    library.checkout_books([("Alice", "The Hobbit"), ("Bob", "The Hobbit"), ("Charlie", "The Hobbit")])
+    print(f"Copies of 'The Hobbit' on the shelf: {library.available_copies('The Hobbit')}")
+    print(f"Borrowers of 'The Hobbit': {library.list_borrowers('The Hobbit')}")
+    library.return_books([("Alice", "The Hobbit"), ("Bob", "The Hobbit")])
+
+    # Due dates, overdue scanning and fines
+    start = date(2024, 3, 1)
+    library.checkout_book("Bob", "Beloved", on=start)
+    library.checkout_book("Diana", "The Road", on=start)
+    library.renew_book("Diana", "The Road", on=start + timedelta(days=10))
+    overdue = library.process_overdue(on=start + timedelta(days=20))
+    print(f"Newly overdue: {overdue}")
+    library.return_book("Bob", "Beloved", on=start + timedelta(days=20))
+    print(f"Bob's fines: {library.get_user_fines('Bob')}")
+
+    # Hold queues with membership priority
+    library.set_membership("Diana", "Premium")
+    library.checkout_book("Alice", "Jane Eyre", on=start)
+    library.place_hold("Bob", "Jane Eyre")
+    library.place_hold("Charlie", "Jane Eyre")
+    library.place_hold("Diana", "Jane Eyre")
+    print(f"Bob's position for 'Jane Eyre': {library.get_hold_position('Bob', 'Jane Eyre')}")
+    library.return_book("Alice", "Jane Eyre", on=start + timedelta(days=5))
+    library.expire_holds(on=start + timedelta(days=13))
+    library.checkout_book("Bob", "Jane Eyre", on=start + timedelta(days=13))
+
+    # Co-checkout recommendations from the loan history
+    library.build_recommendations()
+    library.checkout_books([("Diana", "The Hobbit"), ("Diana", "Beloved")])
+    library.refresh_recommendations()
+    print(f"Readers of 'The Hobbit' also borrowed: {library.recommend_books('The Hobbit')}")
+
     print("\nUser Checkouts After Transactions:")
     for user, checkouts in library.user_checkouts.items():
-        print(f"{user}: {checkouts}")
+        print(f"{user}: {list(checkouts)}")
 
     # Sort books by year
     print("\nBooks Sorted by Year:")
@@ -369,6 +1087,12 @@ if __name__ == "__main__":
     for title, details in library.library_catalog.items():
         print(f"{title}: {details}")
 
+    # Full-text search with typo tolerance and autocomplete
+    print("\nSearch for 'grate gatsbi':")
+    print(library.search_books("grate gatsbi"))
+    print("Autocomplete for 'bron':")
+    print(library.autocomplete_books("bron"))
+
     # Append a new user to the list
     library.append_user("Eve")
     print("\nUpdated List of Users:")